@@ -1,19 +1,156 @@
 #comentario para git hub
 
+import asyncio
+import functools
+import importlib.util
+import io
+import json
+import multiprocessing
 import os
+import threading
+import time
 import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tkinter import filedialog, ttk, messagebox
 
 # -----------
 # Para imágenes
 # -----------
-from PIL import Image
+# Se recomienda Pillow-SIMD (misma API que Pillow, con resize/convert
+# vectorizados) enlazado contra libjpeg-turbo para decodificar/codificar JPEG:
+#   pip uninstall pillow
+#   CFLAGS="-mavx2" pip install --no-binary :all: pillow-simd
+# (con libjpeg-turbo instalado en el sistema antes de compilar).
+# No requiere cambios en el código: Image.resize y Image.save usan esas rutas.
+import PIL
+from PIL import Image, ImageOps, features, JpegImagePlugin, PngImagePlugin
+
+
+def _registrar_formatos():
+    """
+    Registra solo los formatos que usa el programa (JPEG y PNG) y marca
+    Pillow como ya inicializado, para que no importe y pruebe decenas de
+    plugins al abrir imágenes.
+    """
+    Image.register_open(JpegImagePlugin.JpegImageFile.format, JpegImagePlugin.jpeg_factory,
+                        JpegImagePlugin._accept)
+    Image.register_open(PngImagePlugin.PngImageFile.format, PngImagePlugin.PngImageFile,
+                        PngImagePlugin._accept)
+    Image._initialized = 2
+
+
+# Al importar el módulo: así vale también en los procesos del pool, que con
+# 'spawn' lo vuelven a importar
+_registrar_formatos()
+
+# Firma con que empieza todo archivo JPEG (marcador SOI)
+_FIRMA_JPEG = b'\xff\xd8\xff'
+
+# Alternativa vectorizada con Numba para cuando no hay Pillow-SIMD.
+# Es opcional: si numpy/numba no están instalados se usa Image.resize.
+try:
+    import numpy as np
+    import resize_numba
+except ImportError:
+    resize_numba = None
+
+# Pillow-SIMD se publica con versiones del tipo "9.0.0.post1"
+PILLOW_SIMD = '.post' in PIL.__version__
+NUMBA_DISPONIBLE = resize_numba is not None and not PILLOW_SIMD
+
+
+def gpu_instalada():
+    """
+    Indica si están instalados torch y torchvision, necesarios para procesar
+    en GPU NVIDIA (resize_gpu). No los importa: cargar torch es lento y pesado,
+    así que resize_gpu solo se importa cuando se pide usar la GPU.
+    """
+    return all(importlib.util.find_spec(m) is not None for m in ('torch', 'torchvision'))
+
 
 # -----------
 # Para DOCX
 # -----------
+# python-docx solo se usa para crear el esqueleto del documento (estilos,
+# encabezado principal); las imágenes se agregan armando el ZIP directamente.
+import zipfile
+from xml.sax.saxutils import escape
 from docx import Document
-from docx.shared import Inches
+
+EMU_POR_PULGADA = 914400
+
+# Fragmentos de document.xml que se rellenan con str.format por cada sección/imagen
+_XML_TITULO = '<w:p><w:pPr><w:pStyle w:val="Heading2"/></w:pPr><w:r><w:t>{texto}</w:t></w:r></w:p>'
+_XML_PARRAFO = '<w:p><w:r><w:t xml:space="preserve">{texto}</w:t></w:r></w:p>'
+_XML_PARRAFO_VACIO = '<w:p/>'
+_XML_IMAGEN = (
+    '<w:p><w:r><w:drawing>'
+    '<wp:inline xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"'
+    ' distT="0" distB="0" distL="0" distR="0">'
+    '<wp:extent cx="{cx}" cy="{cy}"/>'
+    '<wp:docPr id="{id}" name="Picture {id}"/>'
+    '<wp:cNvGraphicFramePr>'
+    '<a:graphicFrameLocks xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" noChangeAspect="1"/>'
+    '</wp:cNvGraphicFramePr>'
+    '<a:graphic xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">'
+    '<a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+    '<pic:pic xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+    '<pic:nvPicPr><pic:cNvPr id="0" name="{nombre}"/><pic:cNvPicPr/></pic:nvPicPr>'
+    '<pic:blipFill>'
+    '<a:blip xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" r:embed="{rid}"/>'
+    '<a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+    '<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"/></pic:spPr>'
+    '</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>'
+)
+_XML_RELACION = (
+    '<Relationship Id="{rid}" Target="media/{archivo}"'
+    ' Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"/>'
+)
+_XML_TIPO_JPG = '<Default Extension="jpg" ContentType="image/jpeg"/>'
+
+
+# Extensiones que se consideran imágenes (agrega más si necesitas)
+EXTENSIONES_IMAGEN = frozenset({'.png', '.jpg', '.jpeg'})
+
+# Máximo de bytes JPEG que se guardan en memoria para armar el DOCX sin volver
+# a leerlos del disco. Pasado este límite, el resto se lee desde 'ruta_salida'.
+LIMITE_CACHE_DOCX = 512 * 1024 * 1024
+
+# Ancho con que se insertan las imágenes en el DOCX y resolución usada para
+# calcular cuántos píxeles hacen falta (150 DPI se ve nítido incluso impreso)
+ANCHO_DOCX_PULGADAS = 4.0
+DPI_DOCX = 150
+
+# Archivo (dentro de 'ruta_salida') donde se recuerda qué imágenes ya se
+# procesaron y con qué parámetros, para no repetirlas en la siguiente ejecución
+ARCHIVO_REGISTRO = '.normcache.json'
+
+# Tabla para convertir '_' en espacios al armar los títulos de sección
+_TABLA_GUIONES = str.maketrans("_", " ")
+
+# Cuántos archivos por delante de la lectura se le pide al sistema operativo
+# que vaya cargando en caché (posix_fadvise WILLNEED)
+PRECARGA_ARCHIVOS = 8
+
+# Orientaciones EXIF que son rotaciones puras y la transposición que las
+# corrige. Se aplican después de reducir la imagen (mucho más barato); el
+# resto de orientaciones (espejadas, poco comunes) usa ImageOps.exif_transpose.
+_TAG_ORIENTACION = 0x0112
+_ROTACIONES_EXIF = {
+    3: Image.ROTATE_180,
+    6: Image.ROTATE_270,
+    8: Image.ROTATE_90,
+}
+
+# Filtros de redimensionado disponibles en la GUI. BILINEAR es el más rápido
+# y suficiente para miniaturas; LANCZOS queda para trabajos donde la calidad
+# importa más que el tiempo.
+FILTROS = {
+    'Bilineal': Image.BILINEAR,
+    'Bicúbico': Image.BICUBIC,
+    'Lanczos': Image.LANCZOS,
+}
 
 
 # --------------------------------------------------------------------
@@ -21,6 +158,23 @@ from docx.shared import Inches
 # generar DOCX).
 # --------------------------------------------------------------------
 
+def verificar_libjpeg_turbo():
+    """
+    Informa por consola si Pillow está enlazado contra libjpeg-turbo.
+    Devuelve True si lo está.
+    """
+    try:
+        activo = features.check_feature('libjpeg_turbo')
+    except ValueError:
+        # Versiones antiguas de Pillow no reconocen esta característica
+        activo = False
+    if activo:
+        print(f"libjpeg-turbo activo (versión {features.version_feature('libjpeg_turbo')})")
+    else:
+        print("Aviso: Pillow no usa libjpeg-turbo; la codificación JPEG será más lenta.")
+    return activo
+
+
 def obtener_estructura_imagenes(ruta_base):
     """
     Recorre la carpeta 'ruta_base' recursivamente y devuelve una lista
@@ -28,110 +182,643 @@ def obtener_estructura_imagenes(ruta_base):
         [
             {
                 'ruta': 'C:/.../carpeta',
-                'imagenes': ['foto1.jpg', 'foto2.png', ...]
+                'imagenes': ['foto1.jpg', 'foto2.png', ...],
+                'inodos': [1234, 1235, ...],
+                'firmas': [(mtime_ns, tamaño), ...],
+                'rel': 'sub/carpeta'
             },
             ...
         ]
+    'inodos' guarda el número de inodo de cada imagen (misma posición que en
+    'imagenes'), útil para leerlas en el orden físico del disco. 'firmas'
+    permite saber si la imagen cambió desde la última ejecución. 'rel' es la
+    ruta de la carpeta relativa a 'ruta_base'.
     """
     estructura = []
-    for root, dirs, files in os.walk(ruta_base):
-        # Filtra solo archivos de imagen (agrega extensiones si necesitas)
-        imagenes = [f for f in files if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    # Todas las carpetas visitadas empiezan con este prefijo, así que la ruta
+    # relativa se obtiene recortándolo (sin os.path.relpath)
+    ruta_base = os.path.normpath(ruta_base)
+    prefijo = len(os.path.join(ruta_base, ''))
+    # Recorrido en profundidad con una pila explícita. os.scandir entrega el
+    # tipo de cada entrada junto con su nombre, sin un stat extra por archivo.
+    pendientes = [ruta_base]
+    while pendientes:
+        root = pendientes.pop()
+        imagenes = []
+        inodos = []
+        firmas = []
+        subcarpetas = []
+        try:
+            entradas = os.scandir(root)
+        except OSError:
+            # Igual que os.walk: las carpetas que no se pueden leer se omiten
+            continue
+        with entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    subcarpetas.append(entrada.path)
+                elif entrada.is_file() and os.path.splitext(entrada.name)[1].lower() in EXTENSIONES_IMAGEN:
+                    imagenes.append(entrada.name)
+                    inodos.append(entrada.inode())
+                    # En Windows el stat viene gratis con scandir. Sigue los
+                    # enlaces, como is_file(): la firma es la del archivo que
+                    # se lee, no la del enlace
+                    info = entrada.stat()
+                    firmas.append((info.st_mtime_ns, info.st_size))
         if imagenes:
             estructura.append({
                 'ruta': root,
-                'imagenes': imagenes
+                'imagenes': imagenes,
+                'inodos': inodos,
+                'firmas': firmas,
+                'rel': root[prefijo:]
             })
+        # Se apilan al revés para visitar las subcarpetas en el orden listado
+        pendientes.extend(reversed(subcarpetas))
     return estructura
 
 
-def procesar_imagen(ruta_imagen, ruta_salida, ancho=1280, alto=720, calidad=85):
+def procesar_bytes(datos, ancho=1280, alto=720, calidad=85, filtro=Image.BILINEAR,
+                   usar_numba=False):
     """
-    Abre la imagen en 'ruta_imagen', la convierte a JPG, la redimensiona a (ancho x alto)
-    y la guarda en 'ruta_salida' con la calidad especificada.
+    Recibe el contenido de un archivo de imagen ('datos'), lo convierte a JPG,
+    lo redimensiona a (ancho x alto) con el filtro indicado y devuelve los bytes
+    del JPG resultante con la calidad especificada. No toca el disco.
+    Respeta la orientación EXIF (fotos de celular), girando solo si hace falta.
+    Con 'usar_numba' y filtro bilineal se redimensiona con resize_numba.
     """
-    with Image.open(ruta_imagen) as img:
-        # Convertir a RGB (por si es PNG con canal alpha)
-        img = img.convert('RGB')
+    if datos.startswith(_FIRMA_JPEG):
+        # JPEG: se construye directo con su plugin, sin detectar el formato
+        img = JpegImagePlugin.JpegImageFile(io.BytesIO(datos))
+    else:
+        img = Image.open(io.BytesIO(datos), formats=('PNG', 'JPEG'))
+    try:
+        orientacion = img.getexif().get(_TAG_ORIENTACION, 1)
+        rotacion = _ROTACIONES_EXIF.get(orientacion)
+        # Con giros de 90°/270° la imagen guardada está "acostada": se reduce a
+        # (alto x ancho) y se gira al final, ya pequeña
+        ancho_r, alto_r = (alto, ancho) if orientacion in (6, 8) else (ancho, alto)
+        # En JPEG, pide a libjpeg decodificar directamente a 1/2, 1/4... del tamaño
+        # (escalado en la DCT) sin bajar de 2x el destino. En otros formatos no hace nada.
+        img.draft('RGB', (ancho_r * 2, alto_r * 2))
+        if orientacion != 1 and rotacion is None:
+            # Orientación espejada: se corrige antes de redimensionar
+            corregida = ImageOps.exif_transpose(img)
+            img.close()
+            img = corregida
+        # Imágenes con transparencia (PNG): se componen sobre fondo blanco, no
+        # negro como haría convert('RGB'). Cada paso cierra la imagen anterior
+        # para no mantener vivos varios buffers de píxeles.
+        if img.mode == 'P' and 'transparency' in img.info:
+            rgba = img.convert('RGBA')
+            img.close()
+            img = rgba
+        if img.mode in ('RGBA', 'LA'):
+            fondo = Image.new('RGB', img.size, (255, 255, 255))
+            fondo.paste(img, mask=img.getchannel('A'))
+            img.close()
+            img = fondo
+        # Convertir a RGB el resto de modos (escala de grises, CMYK, paleta...)
+        if img.mode != 'RGB':
+            rgb = img.convert('RGB')
+            img.close()
+            img = rgb
         # Redimensionar (forzado). Para mantener proporciones, haz un cálculo previo.
-        img = img.resize((ancho, alto))
-        
-        # Crear carpeta de salida si no existe
-        os.makedirs(os.path.dirname(ruta_salida), exist_ok=True)
-        # Guardar como JPG con la calidad especificada
-        img.save(ruta_salida, 'JPEG', quality=calidad)
+        if usar_numba and filtro == Image.BILINEAR:
+            # El kernel es un bilineal de 2x2 sin antialias: primero se reduce
+            # promediando bloques hasta quedar a menos de 2x del destino, para
+            # no generar moiré (sobre todo en PNG, que no pasan por draft)
+            factor = (max(1, img.width // ancho_r), max(1, img.height // alto_r))
+            if factor != (1, 1):
+                por_bloques = img.reduce(factor)
+                img.close()
+                img = por_bloques
+            # Escribe en un buffer reutilizado entre imágenes del mismo tamaño
+            salida = _buffer_salida(alto_r, ancho_r)
+            resize_numba.bilinear_rgb_en(np.asarray(img), salida)
+            reducida = Image.fromarray(salida)
+        else:
+            # reducing_gap reduce primero por bloques (barato) y luego aplica el filtro.
+            reducida = img.resize((ancho_r, alto_r), resample=filtro, reducing_gap=2.0)
+    finally:
+        img.close()
+
+    if rotacion is not None:
+        girada = reducida.transpose(rotacion)
+        reducida.close()
+        reducida = girada
+
+    # Codificar como JPG con la calidad especificada
+    try:
+        buf = io.BytesIO()
+        reducida.save(buf, 'JPEG', quality=calidad)
+        return buf.getvalue()
+    finally:
+        reducida.close()
+
+
+# Buffers de salida del redimensionado con Numba, por (alto, ancho). Cada
+# proceso del pool tiene los suyos y los reutiliza en todas sus imágenes.
+_buffers_salida = {}
+
+
+def _buffer_salida(alto, ancho):
+    buf = _buffers_salida.get((alto, ancho))
+    if buf is None:
+        buf = _buffers_salida[(alto, ancho)] = np.empty((alto, ancho, 3), dtype=np.uint8)
+    return buf
+
+
+@functools.lru_cache(maxsize=None)
+def numba_mas_rapido(ancho, alto, repeticiones=3):
+    """
+    Mide en esta máquina si el kernel de Numba (con su reducción previa) le
+    gana a Image.resize bilineal, sobre una imagen de prueba del doble del
+    destino. Devuelve False si Numba no está disponible. El resultado se
+    guarda por tamaño, para no repetir la medición en cada ejecución desde la
+    GUI.
+    """
+    if not NUMBA_DISPONIBLE:
+        return False
+    with Image.effect_noise((ancho * 2, alto * 2), 64) as ruido:
+        prueba = ruido.convert('RGB')
+    salida = np.empty((alto, ancho, 3), dtype=np.uint8)
+
+    def con_numba():
+        with prueba.reduce(2) as por_bloques:
+            resize_numba.bilinear_rgb_en(np.asarray(por_bloques), salida)
+
+    def con_pillow():
+        prueba.resize((ancho, alto), resample=Image.BILINEAR, reducing_gap=2.0).close()
+
+    tiempos = []
+    for funcion in (con_numba, con_pillow):
+        funcion()  # la primera llamada no cuenta (cachés, carga del kernel)
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    prueba.close()
+    return tiempos[0] < tiempos[1]
+
+
+def procesar_imagen(ruta_imagen, ruta_salida, ancho=1280, alto=720, calidad=85,
+                    filtro=Image.BILINEAR, usar_numba=False):
+    """
+    Abre la imagen en 'ruta_imagen', la convierte a JPG, la redimensiona a (ancho x alto)
+    con el filtro indicado y la guarda en 'ruta_salida' con la calidad especificada.
+    La carpeta de 'ruta_salida' debe existir: main las crea todas antes de procesar.
+    Devuelve los bytes del JPG guardado.
+    """
+    jpg = procesar_bytes(_leer_archivo(ruta_imagen), ancho, alto, calidad, filtro, usar_numba)
+    _escribir_archivo(ruta_salida, jpg)
+    return jpg
+
+
+def _leer_archivo(ruta):
+    with open(ruta, 'rb') as f:
+        return f.read()
+
+
+def _precargar(rutas):
+    """
+    Pide al sistema operativo que empiece a leer 'rutas' en segundo plano,
+    para que ya estén en caché cuando el lector llegue a ellas. En sistemas
+    sin posix_fadvise (Windows, macOS) no hace nada.
+    """
+    try:
+        fadvise = os.posix_fadvise
+    except AttributeError:
+        return
+    for ruta in rutas:
+        try:
+            fd = os.open(ruta, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _escribir_archivo(ruta, datos):
+    with open(ruta, 'wb') as f:
+        f.write(datos)
+
+
+def _procesar_con_ruta(ruta, datos, ancho, alto, calidad, filtro, usar_numba):
+    """
+    Llama a procesar_bytes y, si falla, indica en el error qué archivo era
+    (procesar_bytes solo ve los bytes, no la ruta).
+    """
+    try:
+        return procesar_bytes(datos, ancho, alto, calidad, filtro, usar_numba)
+    except Exception as e:
+        raise ValueError(f"{ruta}: {e}") from e
+
+
+def _procesar_lote(rutas, lote, ancho, alto, calidad, filtro, usar_numba):
+    """
+    Procesa en un solo viaje al pool una lista de contenidos de imagen y
+    devuelve la lista de JPG resultantes (en el mismo orden). 'rutas' son los
+    archivos de origen, usados solo para los mensajes de error.
+    """
+    return [_procesar_con_ruta(ruta, datos, ancho, alto, calidad, filtro, usar_numba)
+            for ruta, datos in zip(rutas, lote)]
+
+
+def _procesar_lote_gpu(gpu, rutas, lote, ancho, alto, calidad, filtro, usar_numba):
+    """
+    Igual que _procesar_lote, pero envía a la GPU los JPEG sin rotación EXIF,
+    en sublotes de hasta resize_gpu.MAX_PIXELES_LOTE píxeles. El resto (PNG,
+    fotos giradas, cabeceras ilegibles) se reparte en el pool de procesos
+    gpu['pool'] mientras la GPU trabaja. En la GPU siempre se usa filtro
+    bilineal con antialias.
+    'gpu' es el estado compartido entre lotes. Si la GPU falla (memoria,
+    controlador) se avisa, se pone gpu['activa'] en False y desde ahí todo va
+    al pool; las rutas que por eso no se procesaron en GPU quedan en
+    gpu['sin_gpu'].
+    """
+    import resize_gpu
+
+    def al_pool(indices):
+        return {i: gpu['pool'].submit(_procesar_con_ruta, rutas[i], lote[i], ancho, alto,
+                                      calidad, filtro, usar_numba)
+                for i in indices}
+
+    a_cpu = []
+    sublotes = []
+    actual, pixeles = [], 0
+    for i, datos in enumerate(lote):
+        tamano = None
+        if datos.startswith(_FIRMA_JPEG):
+            # Solo lee la cabecera para conocer la orientación y el tamaño
+            try:
+                with JpegImagePlugin.JpegImageFile(io.BytesIO(datos)) as img:
+                    if img.getexif().get(_TAG_ORIENTACION, 1) == 1:
+                        tamano = img.size[0] * img.size[1]
+            except (OSError, SyntaxError, ValueError):
+                pass  # Dañada: procesar_bytes informará el error con la ruta
+        if tamano is None:
+            a_cpu.append(i)
+            continue
+        if actual and pixeles + tamano > resize_gpu.MAX_PIXELES_LOTE:
+            sublotes.append(actual)
+            actual, pixeles = [], 0
+        actual.append(i)
+        pixeles += tamano
+    if actual:
+        sublotes.append(actual)
+
+    resultados = [None] * len(lote)
+    pendientes = al_pool(a_cpu)
+    for sublote in sublotes:
+        if gpu['activa']:
+            try:
+                jpgs = resize_gpu.procesar_lote_jpeg([lote[i] for i in sublote],
+                                                     ancho, alto, calidad)
+            except RuntimeError as e:
+                # Falta de memoria o error de CUDA. Si en cambio era un JPEG que
+                # nvJPEG no pudo decodificar, el pool vuelve a fallar con él y
+                # el error indica el archivo.
+                print(f"Aviso: falló la GPU ({e}); el resto se procesa en CPU.")
+                gpu['activa'] = False
+            else:
+                for i, jpg in zip(sublote, jpgs):
+                    resultados[i] = jpg
+                continue
+        gpu['sin_gpu'].update(rutas[i] for i in sublote)
+        pendientes.update(al_pool(sublote))
+    for i, futuro in pendientes.items():
+        resultados[i] = futuro.result()
+    return resultados
+
+
+def tamano_lote(n_tareas, n_procesos, maximo=16):
+    """
+    Cantidad de imágenes que se envían juntas a cada proceso: suficientes para
+    amortizar la comunicación entre procesos, pero dejando unos 8 lotes por
+    proceso para repartir bien la carga (y sin pasar de 'maximo', para no
+    mover demasiados bytes en un solo mensaje).
+    """
+    return min(maximo, max(1, n_tareas // (n_procesos * 8)))
+
+
+async def _pipeline(tareas, ex, n_procesos, ancho, alto, calidad, filtro, tam_cola=64,
+                    progreso=None, procesar_lote=_procesar_lote, lote_max=None,
+                    usar_numba=False):
+    """
+    Procesa 'tareas' (lista de (ruta_original, ruta_nueva)) en tres etapas
+    unidas por colas, para que la lectura y escritura en disco se solapen con
+    el trabajo de CPU. Como máximo hay 'tam_cola' imágenes en memoria a la vez
+    (leídas y aún no escritas), sin importar el número de procesos:
+      lector (hilo) -> procesadores (pool 'ex', por lotes) -> escritor (hilo)
+    Los lotes se escriben en el orden en que terminan, así una imagen lenta no
+    frena al resto. Si se indica, 'progreso(hechas, total)' se llama después de
+    escribir cada imagen. 'procesar_lote' es la función que corre en 'ex' y
+    'lote_max' el tamaño de lote (por defecto, el que indica tamano_lote).
+    Devuelve un diccionario {ruta_nueva: bytes JPG} con las imágenes que
+    caben en LIMITE_CACHE_DOCX, para reutilizarlas en generar_docx.
+    """
+    loop = asyncio.get_running_loop()
+    # Dos lotes en vuelo por proceso para que ninguno quede esperando datos
+    n_procesadores = 2 * n_procesos
+    if lote_max is None:
+        lote_max = tamano_lote(len(tareas), n_procesos)
+    # Que los lotes en vuelo de todos los procesadores quepan en tam_cola
+    lote_max = max(1, min(lote_max, tam_cola // n_procesadores))
+    # Imágenes en memoria: el lector toma un lugar por archivo leído y el
+    # escritor lo devuelve al escribirlo. Las colas no necesitan otro límite.
+    en_memoria = asyncio.Semaphore(tam_cola)
+    cola_lectura = asyncio.Queue()
+    cola_escritura = asyncio.Queue()
+    cache = {}
+    bytes_en_cache = 0
+    hechas = 0
+
+    async def lector():
+        precargas = []
+        precargadas = 0
+        for i in range(0, len(tareas), lote_max):
+            # Avisar por adelantado del lote actual y los PRECARGA_ARCHIVOS siguientes
+            fin = min(len(tareas), i + lote_max + PRECARGA_ARCHIVOS)
+            if fin > precargadas:
+                rutas = [ruta_original for ruta_original, _ in tareas[precargadas:fin]]
+                precargas.append(asyncio.create_task(asyncio.to_thread(_precargar, rutas)))
+                precargadas = fin
+            lote = tareas[i:i + lote_max]
+            datos = []
+            for ruta_original, _ in lote:
+                await en_memoria.acquire()
+                datos.append(await asyncio.to_thread(_leer_archivo, ruta_original))
+            await cola_lectura.put((lote, datos))
+        for _ in range(n_procesadores):
+            await cola_lectura.put(None)
+        await asyncio.gather(*precargas)
+
+    async def procesador():
+        while (item := await cola_lectura.get()) is not None:
+            lote, datos = item
+            jpgs = await loop.run_in_executor(ex, procesar_lote,
+                                              [ruta_original for ruta_original, _ in lote], datos,
+                                              ancho, alto, calidad, filtro, usar_numba)
+            await cola_escritura.put(([ruta_nueva for _, ruta_nueva in lote], jpgs))
+
+    async def escritor():
+        nonlocal bytes_en_cache, hechas
+        while (item := await cola_escritura.get()) is not None:
+            for ruta_nueva, jpg in zip(*item):
+                await asyncio.to_thread(_escribir_archivo, ruta_nueva, jpg)
+                en_memoria.release()
+                if bytes_en_cache + len(jpg) <= LIMITE_CACHE_DOCX:
+                    cache[ruta_nueva] = jpg
+                    bytes_en_cache += len(jpg)
+                hechas += 1
+                if progreso is not None:
+                    progreso(hechas, len(tareas))
+
+    tarea_escritor = asyncio.create_task(escritor())
+    await asyncio.gather(lector(), *(procesador() for _ in range(n_procesadores)))
+    await cola_escritura.put(None)
+    await tarea_escritor
+    return cache
+
+
+def ajustar_a_docx(ancho, alto, ancho_docx_pulgadas=ANCHO_DOCX_PULGADAS):
+    """
+    Limita (ancho x alto) a los píxeles que realmente se verán en el DOCX
+    (ancho_docx_pulgadas a DPI_DOCX), manteniendo la proporción pedida.
+    Procesar más píxeles que esos solo agranda el trabajo y el archivo.
+    """
+    ancho_max = int(ancho_docx_pulgadas * DPI_DOCX)
+    if ancho <= ancho_max:
+        return ancho, alto
+    return ancho_max, max(1, round(alto * ancho_max / ancho))
 
 
-def construir_ruta_salida(ruta_base, ruta_destino, root, nombre_imagen):
+def cargar_registro(ruta_salida):
     """
-    Construye la ruta de salida para la imagen, manteniendo la estructura de carpetas
-    con base en la ruta_base y el directorio actual 'root'.
+    Lee el registro de imágenes ya procesadas en 'ruta_salida'. Devuelve un
+    diccionario vacío si no existe o está dañado.
     """
-    ruta_relativa = os.path.relpath(root, ruta_base)
-    return os.path.join(ruta_destino, ruta_relativa, nombre_imagen)
+    try:
+        with open(os.path.join(ruta_salida, ARCHIVO_REGISTRO), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
 
-def generar_docx(estructura, ruta_base, ruta_salida, ruta_docx):
+def guardar_registro(ruta_salida, registro):
+    """
+    Guarda el registro de imágenes procesadas en 'ruta_salida'.
+    """
+    with open(os.path.join(ruta_salida, ARCHIVO_REGISTRO), 'w', encoding='utf-8') as f:
+        json.dump(registro, f)
+
+
+def generar_docx(estructura, ruta_salida, ruta_docx, cache=None,
+                 ancho_docx_pulgadas=ANCHO_DOCX_PULGADAS, tamano_px=None):
     """
     Genera un archivo DOCX en 'ruta_docx' donde cada sección corresponde
     a la jerarquía de carpetas encontrada, e incluye las imágenes procesadas.
+    'cache' es un diccionario opcional {ruta procesada: bytes JPG}; las imágenes
+    que estén en él no se vuelven a leer del disco. 'tamano_px' es el (ancho, alto)
+    de las imágenes procesadas; si no se indica, se lee de cada imagen.
+
+    python-docx solo crea el esqueleto; el contenido se arma como texto XML y
+    las imágenes se escriben directo en el ZIP, evitando que python-docx
+    manipule el árbol XML y abra cada imagen al insertarla. Las imágenes se
+    guardan sin comprimir (ya son JPG) y el XML con deflate nivel 1.
     """
+    if cache is None:
+        cache = {}
     document = Document()
     document.add_heading('Documento de Imágenes', level=1)
-
-    for elemento in estructura:
-        # Calculamos la ruta relativa y usamos cada carpeta como parte del título
-        ruta_carpetas = os.path.relpath(elemento['ruta'], ruta_base)
-        secciones = ruta_carpetas.split(os.sep)
-        titulo_seccion = ", ".join([s.replace("_", " ").title() for s in secciones])
-        
-        # Insertamos un encabezado (nivel 2) con el nombre de la sección
-        document.add_heading(titulo_seccion, level=2)
-
-        # Para cada imagen en la carpeta
-        for img_name in elemento['imagenes']:
-            # La imagen procesada se encuentra en 'ruta_salida' con la misma ruta relativa
-            ruta_imagen_procesada = construir_ruta_salida(ruta_base, ruta_salida, elemento['ruta'], img_name)
-            
-            # Abrir la imagen para obtener sus dimensiones
-            with Image.open(ruta_imagen_procesada) as img:
-                ancho_original, alto_original = img.size
+    esqueleto = io.BytesIO()
+    document.save(esqueleto)
+
+    fragmentos = []
+    relaciones = []
+    n_imagen = 0
+
+    with zipfile.ZipFile(esqueleto) as zip_base, \
+            zipfile.ZipFile(ruta_docx, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zip_docx:
+        for elemento in estructura:
+            # Usamos cada carpeta de la ruta relativa como parte del título
+            # ("mall_1/sala_2" -> "Mall 1, Sala 2") en una sola pasada por componente
+            titulo_seccion = elemento['rel'].translate(_TABLA_GUIONES).replace(os.sep, ", ").title()
+
+            # Insertamos un encabezado (nivel 2) con el nombre de la sección
+            fragmentos.append(_XML_TITULO.format(texto=escape(titulo_seccion)))
+
+            # Para cada imagen en la carpeta
+            for img_name in elemento['imagenes']:
+                # La imagen procesada se encuentra en 'ruta_salida' con la misma ruta relativa
+                ruta_imagen_procesada = os.path.join(ruta_salida, elemento['rel'], img_name)
+
+                # Usar los bytes en memoria si están; si no, leer el archivo procesado
+                jpg = cache.get(ruta_imagen_procesada)
+                if jpg is None:
+                    jpg = _leer_archivo(ruta_imagen_procesada)
+
+                if tamano_px is not None:
+                    ancho_original, alto_original = tamano_px
+                else:
+                    # Solo lee la cabecera para obtener las dimensiones
+                    with Image.open(io.BytesIO(jpg)) as img:
+                        ancho_original, alto_original = img.size
                 # Calcular el ancho en pulgadas manteniendo la proporción
-                ancho_pulgadas = min(4.0, ancho_original / 96)  # 96 DPI es un valor común
+                ancho_pulgadas = min(ancho_docx_pulgadas, ancho_original / 96)  # 96 DPI es un valor común
                 alto_pulgadas = (alto_original / ancho_original) * ancho_pulgadas
 
-            # Insertamos la imagen en el DOCX con el tamaño calculado
-            document.add_picture(ruta_imagen_procesada, width=Inches(ancho_pulgadas), height=Inches(alto_pulgadas))
-            # Añade un párrafo debajo con el nombre
-            document.add_paragraph(f"Imagen: {img_name}")
-
-        # Espacio adicional entre secciones (opcional)
-        document.add_paragraph("")
+                # Insertamos la imagen en el DOCX con el tamaño calculado
+                n_imagen += 1
+                archivo = f"imagen{n_imagen}.jpg"
+                rid = f"rIdImagen{n_imagen}"
+                # Los JPG ya están comprimidos: se guardan sin deflate
+                zip_docx.writestr(f"word/media/{archivo}", jpg, compress_type=zipfile.ZIP_STORED)
+                relaciones.append(_XML_RELACION.format(rid=rid, archivo=archivo))
+                fragmentos.append(_XML_IMAGEN.format(
+                    cx=int(ancho_pulgadas * EMU_POR_PULGADA), cy=int(alto_pulgadas * EMU_POR_PULGADA),
+                    id=n_imagen, nombre=escape(img_name, {'"': '&quot;'}), rid=rid))
+                # Añade un párrafo debajo con el nombre
+                fragmentos.append(_XML_PARRAFO.format(texto=escape(f"Imagen: {img_name}")))
+
+            # Espacio adicional entre secciones (opcional)
+            fragmentos.append(_XML_PARRAFO_VACIO)
+
+        # Copiar el esqueleto, agregando el contenido, las relaciones de las
+        # imágenes y el tipo de contenido JPG
+        for info in zip_base.infolist():
+            datos = zip_base.read(info.filename)
+            if info.filename == 'word/document.xml':
+                xml = datos.decode('utf-8')
+                # El contenido va antes de las propiedades de sección del cuerpo
+                pos = xml.rfind('<w:sectPr')
+                if pos == -1:
+                    pos = xml.rfind('</w:body>')
+                datos = (xml[:pos] + ''.join(fragmentos) + xml[pos:]).encode('utf-8')
+            elif info.filename == 'word/_rels/document.xml.rels':
+                xml = datos.decode('utf-8')
+                pos = xml.rfind('</Relationships>')
+                datos = (xml[:pos] + ''.join(relaciones) + xml[pos:]).encode('utf-8')
+            elif info.filename == '[Content_Types].xml':
+                xml = datos.decode('utf-8')
+                if 'Extension="jpg"' not in xml:
+                    pos = xml.find('<Default ')
+                    if pos == -1:
+                        pos = xml.rfind('</Types>')
+                    datos = (xml[:pos] + _XML_TIPO_JPG + xml[pos:]).encode('utf-8')
+            if os.path.splitext(info.filename)[1].lower() in EXTENSIONES_IMAGEN:
+                zip_docx.writestr(info.filename, datos, compress_type=zipfile.ZIP_STORED)
+            else:
+                zip_docx.writestr(info.filename, datos)
 
-    document.save(ruta_docx)
     print(f"Documento DOCX generado en: {ruta_docx}")
 
 
-def main(ruta_entrada, ruta_salida, ruta_docx, ancho=1280, alto=720, calidad=85):
+def main(ruta_entrada, ruta_salida, ruta_docx, ancho=1280, alto=720, calidad=85,
+         filtro=Image.BILINEAR, ancho_docx_pulgadas=ANCHO_DOCX_PULGADAS,
+         tamano_completo=False, progreso=None, usar_gpu=False):
     """
     Función principal:
       1) Obtiene la estructura de imágenes.
-      2) Procesa/convierte cada imagen y la guarda en 'ruta_salida'.
+      2) Procesa/convierte cada imagen (en paralelo) y la guarda en 'ruta_salida'.
       3) Genera un DOCX con la estructura y las imágenes procesadas.
+    Salvo que 'tamano_completo' sea True, las imágenes se reducen directamente
+    al tamaño con que se verán en el DOCX (ver ajustar_a_docx).
+    'progreso(hechas, total)', si se indica, se llama por cada imagen procesada.
+    Con 'usar_gpu' (y una GPU NVIDIA disponible) los JPEG se procesan por
+    lotes en la GPU (ver _procesar_lote_gpu).
     """
+    verificar_libjpeg_turbo()
+
+    if usar_gpu:
+        try:
+            import resize_gpu
+            usar_gpu = resize_gpu.DISPONIBLE
+        except ImportError:
+            usar_gpu = False
+        if not usar_gpu:
+            print("Aviso: no hay una GPU NVIDIA disponible; se procesa en CPU.")
+
+    if not tamano_completo:
+        ancho, alto = ajustar_a_docx(ancho, alto, ancho_docx_pulgadas)
+
     # 1. Obtener estructura de imágenes
     estructura = obtener_estructura_imagenes(ruta_entrada)
 
-    # 2. Procesar cada imagen
+    # 2. Armar la lista plana de tareas (una por imagen), ordenada por inodo
+    # para que la lectura recorra el disco de forma lo más secuencial posible.
+    # Las imágenes que no cambiaron desde la última ejecución (misma fecha,
+    # tamaño y parámetros, y con su salida aún presente) se omiten.
+    registro_anterior = cargar_registro(ruta_salida)
+    registro = {}
+    claves = {}
+    tareas = []
     for elem in estructura:
         root = elem['ruta']
-        for img_name in elem['imagenes']:
+        for img_name, inodo, (mtime, tamano) in zip(elem['imagenes'], elem['inodos'], elem['firmas']):
             ruta_original = os.path.join(root, img_name)
-            ruta_nueva = construir_ruta_salida(ruta_entrada, ruta_salida, root, img_name)
-            procesar_imagen(ruta_original, ruta_nueva, ancho=ancho, alto=alto, calidad=calidad)
-
-    # 3. Generar el documento DOCX
-    generar_docx(estructura, ruta_entrada, ruta_salida, ruta_docx)
+            ruta_nueva = os.path.join(ruta_salida, elem['rel'], img_name)
+            clave = os.path.join(elem['rel'], img_name)
+            claves[ruta_original] = clave
+            registro[clave] = {'mtime': mtime, 'size': tamano, 'ancho': ancho,
+                               'alto': alto, 'calidad': calidad, 'filtro': filtro,
+                               'gpu': usar_gpu}
+            if registro_anterior.get(clave) == registro[clave] and os.path.exists(ruta_nueva):
+                continue
+            tareas.append((inodo, ruta_original, ruta_nueva))
+    tareas.sort()
+    tareas = [(ruta_original, ruta_nueva) for _, ruta_original, ruta_nueva in tareas]
+
+    # El kernel de Numba solo se usa si aquí realmente es más rápido que
+    # Pillow. La medición toma un momento, así que se omite si no hay nada
+    # que procesar
+    usar_numba = bool(tareas) and filtro == Image.BILINEAR and numba_mas_rapido(ancho, alto)
+
+    # Crear las carpetas de salida una sola vez (una por carpeta de entrada),
+    # antes de repartir el trabajo, para que los procesos no compitan
+    # llamando a os.makedirs
+    carpetas_salida = {os.path.join(ruta_salida, elem['rel']) for elem in estructura}
+    for carpeta in carpetas_salida:
+        os.makedirs(carpeta, exist_ok=True)
+
+    # Procesar las imágenes en paralelo (son independientes entre sí),
+    # solapando la lectura/escritura en disco con la CPU.
+    # Windows no admite más de 61 procesos en un ProcessPoolExecutor
+    n_procesos = min(61, os.cpu_count() or 1)
+    # 'spawn' en todas las plataformas (como en Windows): los procesos no
+    # heredan el estado de Numba del principal, que puede haber compilado
+    # y ejecutado ya los kernels, y hacer fork con eso puede bloquear al
+    # intérprete al salir
+    with ProcessPoolExecutor(max_workers=n_procesos,
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        if usar_gpu:
+            # La GPU se usa desde un único hilo del proceso principal, por
+            # lotes; lo que no va a la GPU se reparte en el pool de procesos
+            gpu = {'pool': pool, 'activa': True, 'sin_gpu': set()}
+            with ThreadPoolExecutor(max_workers=1) as ex:
+                # Lotes de 32: lo más que admite _pipeline con tam_cola=64
+                cache = asyncio.run(_pipeline(tareas, ex, 1, ancho, alto, calidad, filtro,
+                                              progreso=progreso,
+                                              procesar_lote=functools.partial(_procesar_lote_gpu, gpu),
+                                              lote_max=32, usar_numba=usar_numba))
+            for ruta_original in gpu['sin_gpu']:
+                registro[claves[ruta_original]]['gpu'] = False
+        else:
+            cache = asyncio.run(_pipeline(tareas, pool, n_procesos, ancho, alto, calidad, filtro,
+                                          progreso=progreso, usar_numba=usar_numba))
+    # Solo se guarda si todo el procesamiento terminó sin errores. Sin
+    # imágenes no se creó ninguna carpeta, así que se asegura la de salida
+    os.makedirs(ruta_salida, exist_ok=True)
+    guardar_registro(ruta_salida, registro)
+
+    # 3. Generar el documento DOCX (reutilizando los JPG que quedaron en memoria)
+    generar_docx(estructura, ruta_salida, ruta_docx, cache=cache,
+                 ancho_docx_pulgadas=ancho_docx_pulgadas, tamano_px=(ancho, alto))
 
 
 # --------------------------------------------------------------------
@@ -153,6 +840,12 @@ class Aplicacion:
         self.alto = tk.IntVar(value=720)
         # Calidad por defecto 85
         self.calidad = tk.IntVar(value=85)
+        # Filtro de redimensionado (Bilineal es el más rápido)
+        self.filtro = tk.StringVar(value='Bilineal')
+        # Si está desmarcado, las imágenes se reducen al tamaño que tendrán en el DOCX
+        self.tamano_completo = tk.BooleanVar(value=False)
+        # Procesar en GPU NVIDIA (solo si torch/torchvision con CUDA están disponibles)
+        self.usar_gpu = tk.BooleanVar(value=False)
 
         # Diseño de la interfaz
         ttk.Label(root, text="Directorio de entrada:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
@@ -176,7 +869,22 @@ class Aplicacion:
         ttk.Label(root, text="Calidad JPG (1-95):").grid(row=5, column=0, padx=5, pady=5, sticky='w')
         ttk.Entry(root, textvariable=self.calidad, width=10).grid(row=5, column=1, sticky='w', padx=5, pady=5)
 
-        ttk.Button(root, text="Procesar", command=self.procesar).grid(row=6, column=0, columnspan=3, pady=10)
+        ttk.Label(root, text="Filtro de redimensionado:").grid(row=6, column=0, padx=5, pady=5, sticky='w')
+        ttk.Combobox(root, textvariable=self.filtro, values=list(FILTROS), state='readonly',
+                     width=10).grid(row=6, column=1, sticky='w', padx=5, pady=5)
+
+        ttk.Checkbutton(root, text="Guardar imágenes en tamaño completo (archivo)",
+                        variable=self.tamano_completo).grid(row=7, column=0, columnspan=3, padx=5, pady=5, sticky='w')
+
+        ttk.Checkbutton(root, text="Usar GPU (NVIDIA)", variable=self.usar_gpu,
+                        state='normal' if gpu_instalada() else 'disabled').grid(row=8, column=0, columnspan=3, padx=5, pady=5, sticky='w')
+
+        self.boton_procesar = ttk.Button(root, text="Procesar", command=self.procesar)
+        self.boton_procesar.grid(row=9, column=0, columnspan=3, pady=10)
+
+        # Avance del procesamiento de imágenes
+        self.barra_progreso = ttk.Progressbar(root, mode='determinate')
+        self.barra_progreso.grid(row=10, column=0, columnspan=3, padx=5, pady=5, sticky='we')
 
     def seleccionar_directorio_entrada(self):
         carpeta = filedialog.askdirectory(title="Seleccionar carpeta de entrada")
@@ -197,31 +905,86 @@ class Aplicacion:
         if archivo:
             self.ruta_docx.set(archivo)
 
-    def procesar(self):
+    def leer_parametros(self):
         """
-        Llama a la función principal con los parámetros
-        ingresados por el usuario en la interfaz.
+        Lee y valida los valores de la interfaz y los devuelve como tipos
+        nativos de Python (sin objetos de tkinter, que no se pueden enviar a
+        otros procesos). Lanza ValueError con un mensaje para el usuario si
+        algún valor no es válido.
         """
-        ruta_entrada = self.ruta_entrada.get()
-        ruta_salida = self.ruta_salida.get()
-        ruta_docx = self.ruta_docx.get()
-        ancho = self.ancho.get()
-        alto = self.alto.get()
-        calidad = self.calidad.get()
-
+        try:
+            ancho = int(self.ancho.get())
+            alto = int(self.alto.get())
+            calidad = int(self.calidad.get())
+        except (tk.TclError, ValueError):
+            raise ValueError("Ancho, alto y calidad deben ser números enteros.")
+        if ancho <= 0 or alto <= 0:
+            raise ValueError("Ancho y alto deben ser mayores que cero.")
+        if not 1 <= calidad <= 95:
+            raise ValueError("La calidad JPG debe estar entre 1 y 95.")
+
+        ruta_entrada = str(self.ruta_entrada.get())
+        ruta_salida = str(self.ruta_salida.get())
+        ruta_docx = str(self.ruta_docx.get())
         # Verifica que no falten parámetros
         if not (ruta_entrada and ruta_salida and ruta_docx):
-            messagebox.showwarning("Atención", "Por favor, selecciona todas las rutas.")
+            raise ValueError("Por favor, selecciona todas las rutas.")
+
+        return {
+            'ruta_entrada': ruta_entrada,
+            'ruta_salida': ruta_salida,
+            'ruta_docx': ruta_docx,
+            'ancho': ancho,
+            'alto': alto,
+            'calidad': calidad,
+            'filtro': FILTROS[self.filtro.get()],
+            'tamano_completo': bool(self.tamano_completo.get()),
+            'usar_gpu': bool(self.usar_gpu.get()),
+        }
+
+    def procesar(self):
+        """
+        Llama a la función principal con los parámetros
+        ingresados por el usuario en la interfaz. El procesamiento corre en un
+        hilo aparte para que la ventana siga respondiendo.
+        """
+        try:
+            parametros = self.leer_parametros()
+        except ValueError as e:
+            messagebox.showwarning("Atención", str(e))
             return
 
-        # Ejecuta el proceso
+        self.boton_procesar.config(state='disabled')
+        self.barra_progreso.config(value=0, maximum=1)
+        threading.Thread(target=self._ejecutar, args=(parametros,), daemon=True).start()
+
+    def _ejecutar(self, parametros):
+        """
+        Corre en el hilo de trabajo. Los resultados se devuelven al hilo de la
+        interfaz con root.after, porque tkinter solo debe usarse desde ese hilo.
+        """
         try:
-            main(ruta_entrada, ruta_salida, ruta_docx, ancho=ancho, alto=alto, calidad=calidad)
+            main(**parametros, progreso=self._progreso)
+        except Exception as e:
+            self.root.after(0, self._terminar, e, parametros['ruta_docx'])
+        else:
+            self.root.after(0, self._terminar, None, parametros['ruta_docx'])
+
+    def _progreso(self, hechas, total):
+        # Llamado desde el hilo de trabajo por cada imagen procesada
+        self.root.after(0, self._actualizar_progreso, hechas, total)
+
+    def _actualizar_progreso(self, hechas, total):
+        self.barra_progreso.config(value=hechas, maximum=total)
+
+    def _terminar(self, error, ruta_docx):
+        self.boton_procesar.config(state='normal')
+        if error is None:
             # Muestra un mensaje indicando que terminó
             messagebox.showinfo("Proceso Completado", f"El documento se ha generado en:\n{ruta_docx}")
-        except Exception as e:
+        else:
             # Mensaje de error
-            messagebox.showerror("Error", f"Ocurrió un error durante el procesamiento:\n{e}")
+            messagebox.showerror("Error", f"Ocurrió un error durante el procesamiento:\n{error}")
 
 
 def main_gui():
@@ -231,6 +994,12 @@ def main_gui():
 
 
 if __name__ == "__main__":
+    # Este guard es obligatorio: el pool de procesos usa 'spawn' y cada proceso
+    # hijo vuelve a importar este módulo. En el .exe de PyInstaller, además,
+    # freeze_support() hace que los hijos ejecuten su tarea en vez de abrir
+    # otra ventana; debe ser lo primero que se ejecute.
+    multiprocessing.freeze_support()
+
     # Si quieres usar la interfaz GUI, descomenta esto:
     main_gui()
 
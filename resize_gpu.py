@@ -0,0 +1,33 @@
+# --------------------------------------------------------------------
+# Procesamiento de JPEG por lotes en GPU (NVIDIA) con torchvision.
+#
+# Decodifica con nvJPEG, redimensiona y vuelve a codificar en la GPU.
+# Requiere torch y torchvision con soporte CUDA; si no están instalados,
+# normalizador.py sigue usando el procesamiento en CPU.
+# --------------------------------------------------------------------
+
+import torch
+from torchvision.io import ImageReadMode, decode_jpeg, encode_jpeg
+from torchvision.transforms.v2 import functional as F
+
+DISPONIBLE = torch.cuda.is_available()
+
+# Píxeles (de las imágenes originales) por lote: suficientes para amortizar
+# las copias CPU <-> GPU. Decodificadas ocupan 3 bytes por píxel, unos 300 MB,
+# más lo que usa el redimensionado; se limita por píxeles y no por cantidad
+# de imágenes para no agotar la memoria de la GPU con fotos grandes.
+MAX_PIXELES_LOTE = 100_000_000
+
+
+def procesar_lote_jpeg(lote, ancho, alto, calidad):
+    """
+    Recibe una lista de contenidos de archivos JPEG y devuelve la lista de
+    JPG redimensionados a (ancho x alto) con la calidad indicada, en el mismo
+    orden. El redimensionado es bilineal con antialias. No aplica la
+    orientación EXIF: quien llama debe enviar solo imágenes ya derechas.
+    """
+    datos = [torch.frombuffer(bytearray(d), dtype=torch.uint8) for d in lote]
+    imagenes = decode_jpeg(datos, mode=ImageReadMode.RGB, device='cuda')
+    reducidas = [F.resize(img, [alto, ancho], antialias=True) for img in imagenes]
+    codificadas = encode_jpeg(reducidas, quality=calidad)
+    return [c.cpu().numpy().tobytes() for c in codificadas]